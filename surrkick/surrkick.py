@@ -12,21 +12,29 @@ from __future__ import print_function,division
 import sys
 import os
 import time
+import timeit
 import numpy as np
 import scipy.integrate
 import scipy.optimize
 import scipy.stats
 from scipy.interpolate import InterpolatedUnivariateSpline as spline
+from scipy.interpolate import CubicSpline
 import NRSur7dq2
 from singleton_decorator import singleton
 import h5py
 from tqdm import tqdm
 import pickle
+PICKLE_PROTOCOL = pickle.HIGHEST_PROTOCOL # Protocol 5 on python>=3.8: near zero-copy for numpy payloads
 import multiprocessing, pathos.multiprocessing
 import precession
+from functools import lru_cache
 import warnings
 import json
 import gwsurrogate as gws
+try: # Optional: fused flux kernel. Everything falls back to vectorized numpy if numba is missing.
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # Path to surrogate model
 # path_to_sur = '/home/ritesh/Surrogate/Surrogate_data/NRHybSur3dq8.h5'
@@ -46,29 +54,113 @@ class summodes(object):
     '''Return indexes to perform a mode sum in l (from 0 to lmax) and m (from -l to +l).'''
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def single(lmax):
-        '''Single mode sum: Sum_{l,m} with 0<=l<=lmax and -l<=m<=l. Returns a list of (l,m) tuples.
+        '''Single mode sum: Sum_{l,m} with 0<=l<=lmax and -l<=m<=l. Returns a tuple of (l,m) tuples. Results are cached, so the sum is only ever built once per lmax.
         Usage: iterations=surrkick.summodes.single(lmax)'''
 
         iterations=[]
-        for l1 in np.arange(2,lmax+1):
-            for m1 in np.arange(-l1,l1+1):
+        for l1 in range(2,lmax+1):
+            for m1 in range(-l1,l1+1):
                     iterations.append((l1,m1))
-        return iterations
+        return tuple(iterations)
 
     @staticmethod
+    @lru_cache(maxsize=None)
     def double(lmax):
-        '''Double mode sum: Sum_{l1,m1} Sum_{l2,m2}  with 0<=l1,l2<=lmax and -l<=m<=l. Returns a list of (l1,m1,l2,m2) tuples.
+        '''Double mode sum: Sum_{l1,m1} Sum_{l2,m2}  with 0<=l1,l2<=lmax and -l<=m<=l. Returns a tuple of (l1,m1,l2,m2) tuples. Results are cached, so the sum is only ever built once per lmax.
         Usage: iterations=surrkick.summodes.double(lmax)'''
 
         iterations=[]
-        for l1 in np.arange(2,lmax+1):
-            for m1 in np.arange(-l1,l1+1):
-                for l2 in np.arange(2,lmax+1):
-                    for m2 in np.arange(-l2,l2+1):
+        for l1 in range(2,lmax+1):
+            for m1 in range(-l1,l1+1):
+                for l2 in range(2,lmax+1):
+                    for m2 in range(-l2,l2+1):
                         iterations.append((l1,m1,l2,m2))
 
-        return iterations
+        return tuple(iterations)
+
+# Warm up the caches for the lmax values available in the surrogates
+for _lmax in (2,3,4):
+    summodes.single(_lmax)
+    summodes.double(_lmax)
+
+
+if njit is not None:
+
+    @njit(parallel=True,fastmath=True,cache=True)
+    def _fluxes_kernel(H,Hd,A,B,C,D,F,lmax):
+        '''Fused kernel for Eqs. (3.8), (3.14-3.15) and (3.22-3.24) of arXiv:0707.4654. Computes the energy, linear-momentum and angular-momentum fluxes in a single cache-resident pass over the time nodes, parallelized over t. H and Hd are the zero-padded (l,m,t) stacks, A-F the coefficient tables. Returns (dEdt,dPxdt,dPydt,dPzdt,dJxdt,dJydt,dJzdt).'''
+
+        T = Hd.shape[2]
+        offset = lmax+1
+        dEdt = np.empty(T)
+        dPxdt = np.empty(T)
+        dPydt = np.empty(T)
+        dPzdt = np.empty(T)
+        dJxdt = np.empty(T)
+        dJydt = np.empty(T)
+        dJzdt = np.empty(T)
+        for t in prange(T):
+            dE = 0.
+            dPp = 0j
+            dPz = 0j
+            dJx = 0j
+            dJy = 0j
+            dJz = 0j
+            for l in range(2,lmax+1):
+                for m in range(-l,l+1):
+                    k = m+offset
+                    h = H[l,k,t]
+                    hd = Hd[l,k,t]
+                    # Eq. 3.8
+                    dE += hd.real*hd.real + hd.imag*hd.imag
+                    cp = np.conj(Hd[l,k+1,t])
+                    cm = np.conj(Hd[l,k-1,t])
+                    # Eq. 3.14. dPp= dPx + i dPy
+                    dPp += hd * ( A[l,k]*cp + B[l,offset-m]*np.conj(Hd[l-1,k+1,t]) - B[l+1,k+1]*np.conj(Hd[l+1,k+1,t]) )
+                    # Eq. 3.15
+                    dPz += hd * ( C[l,k]*np.conj(hd) + D[l,k]*np.conj(Hd[l-1,k,t]) + D[l+1,k]*np.conj(Hd[l+1,k,t]) )
+                    # Eqs. 3.22-3.24
+                    dJx += h * ( F[l,k]*cp + F[l,offset-m]*cm )
+                    dJy -= h * ( F[l,k]*cp - F[l,offset-m]*cm )
+                    dJz += m * h * np.conj(hd)
+            dEdt[t] = dE * _INV_16PI
+            dPxdt[t] = dPp.real * _INV_8PI
+            dPydt[t] = dPp.imag * _INV_8PI
+            dPzdt[t] = dPz.real * _INV_16PI
+            dJxdt[t] = dJx.imag * _INV_32PI
+            dJydt[t] = dJy.real * _INV_32PI
+            dJzdt[t] = dJz.imag * _INV_16PI
+        return dEdt,dPxdt,dPydt,dPzdt,dJxdt,dJydt,dJzdt
+
+
+# Squared modulus in one pass, without the sqrt of np.abs
+_abs2 = lambda z: z.real*z.real + z.imag*z.imag
+
+# Prefactors of Eqs. (3.8), (3.14-3.15) and (3.22-3.24) of arXiv:0707.4654, hoisted out of the reductions so the T-length arrays are scaled once
+_INV_8PI = 1/(8*np.pi)
+_INV_16PI = 1/(16*np.pi)
+_INV_32PI = 1/(32*np.pi)
+
+
+def antiderivative(times,Y):
+    '''Cumulative integral of one or more time series sharing the same time nodes, evaluated at the nodes themselves. Columns of Y are integrated together, so a single spline factorization covers all of them.
+    Usage: Yint=surrkick.antiderivative(times,Y)'''
+
+    return CubicSpline(times,Y,axis=0).antiderivative()(times)
+
+
+def shiftmodes(arr,dl,dm):
+    '''Shift a stacked-mode array along the (l,m) axes, i.e. out[l,k,...]=arr[l+dl,k+dm,...], padding with zeros at the boundaries. Used to express the mode-coupling terms of arXiv:0707.4654 as array operations.
+    Usage: out=surrkick.shiftmodes(arr,dl,dm)'''
+
+    out=np.zeros_like(arr)
+    L,M=arr.shape[0],arr.shape[1]
+    l0,l1=max(0,-dl),min(L,L-dl)
+    m0,m1=max(0,-dm),min(M,M-dm)
+    out[l0:l1,m0:m1]=arr[l0+dl:l1+dl,m0+dm:m1+dm]
+    return out
 
 
 class convert(object):
@@ -116,23 +208,24 @@ class surrkick(object):
     - `chi1`: spin vector of the heavier BH.
     - `chi2`: spin vector of the lighter BH.
     - `t_ref`: reference time at which spins are specified (must be -4500<=t_ref<=-100)
+    - `modes`: optional list of (l,m) modes requested from the surrogate (default: all available modes).
     '''
 
-    def __init__(self,path_to_sur,q=1,chi1=[0,0,0],chi2=[0,0,0],dt=0.1,f_low=0.005):
+    def __init__(self,path_to_sur,q=1,chi1=[0,0,0],chi2=[0,0,0],dt=0.1,f_low=0.005,modes=None):
         '''Initialize the `surrkick` class.'''
 
         self.sur=surrogate().sur(path_to_sur)
         '''Initialize the surrogate. Note it's a singleton'''
 
-        self.q = max(q,1/q)
+        self.q = q if q>=1. else 1./q
         '''Binary mass ratio in the range 1:1 to 2:1.
         Usage: q=surrkick.surrkick().q'''
 
-        self.chi1 = np.array(chi1)
+        self.chi1 = np.asarray(chi1,dtype=np.float64)
         '''Spin vector of the heavier BH.
         Usage: chi1=surrkick.surrkick().chi1'''
 
-        self.chi2 = np.array(chi2)
+        self.chi2 = np.asarray(chi2,dtype=np.float64)
         '''Spin vector of the lighter BH.
         Usage: chi2=surrkick.surrkick().chi2'''
 
@@ -142,6 +235,10 @@ class surrkick(object):
         self.f_low = f_low
         '''Initial frequency'''
 
+        self.modes = modes
+        '''Optional list of (l,m) modes requested from the surrogate; None means all. Restricting to l<=3 speeds up kick-only sweeps (l=4 contributions to the radiated quantities are subpercent).
+        Usage: modes=surrkick.surrkick().modes'''
+
 #         # Check the reference time makes sense
 #         self.t_ref=t_ref
 #         '''Reference time at which spins are specified (must be -4500<=t_ref<=-100).
@@ -152,6 +249,9 @@ class surrkick(object):
         self._times = None
         self._hsample = None
         self._hdotsample = None
+        self._Hstack = None
+        self._Hdstack = None
+        self._zeromode = None
         self._lmax = None
         self._dEdt = None
         self._Eoft = None
@@ -207,12 +307,30 @@ class surrkick(object):
 
             return  ( l*(l+1) - m*(m+1) )**0.5
 
+        @classmethod
+        @lru_cache(maxsize=None)
+        def tables(cls,lmax):
+            '''Precompute the a,b,c,d,f coefficients as 2D arrays of shape (lmax+2,2*lmax+3) indexed by (l,m+lmax+1), valid out to l=lmax+1 as needed by the l+1 terms of Eqs. (3.14-3.15). Entries outside the physical range -l<=m<=l are zero. Results are cached per lmax. Returns a tuple (A,B,C,D,F).
+            Usage: A,B,C,D,F=surrkick.surrkick.coeffs.tables(lmax)'''
+
+            offset=lmax+1
+            shape=(lmax+2,2*lmax+3)
+            A,B,C,D,F=[np.zeros(shape) for _ in range(5)]
+            for l in range(2,lmax+2):
+                for m in range(-l,l+1):
+                    A[l,m+offset]=cls.a(l,m)
+                    B[l,m+offset]=cls.b(l,m)
+                    C[l,m+offset]=cls.c(l,m)
+                    D[l,m+offset]=cls.d(l,m)
+                    F[l,m+offset]=cls.f(l,m)
+            return A,B,C,D,F
+
     @property
     def times(self):
         '''return times if not None. Else load time'''
         
         if self._times is None:
-            self._times, _, _ = self.sur(self.q, self.chi1, self.chi2, dt=self.dt, f_low=self.f_low)
+            self._times, _, _ = self.sur(self.q, self.chi1, self.chi2, dt=self.dt, f_low=self.f_low, mode_list=self.modes)
         
         return self._times
     
@@ -241,7 +359,7 @@ class surrkick(object):
 #             if self.t_ref==-4500: # This is the default value for NRSur7dq2, which wants a None
 #                 self._hsample = self.sur(self.q, self.chi1, self.chi2, dt=self.dt, f_low=self.f_low)
 #             else:
-            _, self._hsample, _ = self.sur(self.q, self.chi1, self.chi2, dt=self.dt, f_low=self.f_low)
+            _, self._hsample, _ = self.sur(self.q, self.chi1, self.chi2, dt=self.dt, f_low=self.f_low, mode_list=self.modes)
             
             # Delete (lm) mode for which m=0 doesn't exist
             modes_to_remove = []
@@ -272,15 +390,14 @@ class surrkick(object):
         return self._lmax
 
     def h(self,l,m):
-        '''Correct the strain values to return zero if either l or m are not allowed (this is how the expressions of arXiv:0707.4654 are supposed to be used). Returns a single mode.
+        '''Correct the strain values to return zero if either l or m are not allowed (this is how the expressions of arXiv:0707.4654 are supposed to be used). Returns a single mode, as a view into the stacked strain array; invalid (l,m) return a cached zero array without allocating.
         Usage: hlm=surrkick.surrkick().h(l,m)'''
 
-        if l<2 or l>self.lmax:
-            return np.zeros(len(self.times),dtype=complex)
-        elif m<-l or m>l:
-            return np.zeros(len(self.times),dtype=complex)
-        else:
-            return self.hsample[l,m]
+        if 2<=l<=self.lmax and -l<=m<=l:
+            return self.Hstack[l,m+self.lmax+1]
+        if self._zeromode is None:
+            self._zeromode = np.zeros(len(self.times),dtype=complex)
+        return self._zeromode
 
     @property
     def hdotsample(self):
@@ -289,8 +406,11 @@ class surrkick(object):
 
         if self._hdotsample is None:
 
-            # Derivatives with splines
-            self._hdotsample =  {k: spline(self.times,v.real).derivative()(self.times)+1j*spline(self.times,v.imag).derivative()(self.times) for k, v in self.hsample.items()}
+            # Derivatives with a single batched spline: all modes share the same time nodes, so one tridiagonal factorization covers every (l,m) instead of two FITPACK fits per mode. CubicSpline handles the complex strain directly.
+            modes = list(self.hsample.keys())
+            H = np.stack([self.hsample[k] for k in modes],axis=1)
+            Hdot = CubicSpline(self.times,H,axis=0).derivative()(self.times)
+            self._hdotsample = {k: np.ascontiguousarray(Hdot[:,i]) for i,k in enumerate(modes)}
 
             # Derivatives with finite differencing
             #self._hdotsample = {k: np.gradient(v,edge_order=2)/np.gradient(self.times,edge_order=2) for k, v in self.hsample.items()}
@@ -298,30 +418,105 @@ class surrkick(object):
         return self._hdotsample
 
     def hdot(self,l,m):
-        '''Correct the hdot values to return zero if either l or m are not allowed (this is how the expressions of arXiv:0707.4654 are supposed to be used). Returns a single mode.
+        '''Correct the hdot values to return zero if either l or m are not allowed (this is how the expressions of arXiv:0707.4654 are supposed to be used). Returns a single mode, as a view into the stacked derivative array; invalid (l,m) return a cached zero array without allocating.
         Usage: hdotlm=surrkick.surrkick().hdot(l,m)'''
 
-        if l<2 or l>self.lmax:
-            return np.zeros(len(self.times),dtype=complex)
-        elif m<-l or m>l:
-            return np.zeros(len(self.times),dtype=complex)
-        else:
-            return self.hdotsample[l,m]
+        if 2<=l<=self.lmax and -l<=m<=l:
+            return self.Hdstack[l,m+self.lmax+1]
+        if self._zeromode is None:
+            self._zeromode = np.zeros(len(self.times),dtype=complex)
+        return self._zeromode
+
+    @property
+    def Hstack(self):
+        '''Strain modes arranged in a zero-padded 3D array of shape (lmax+2,2*lmax+3,T) indexed by (l,m+lmax+1), analogous to Hdstack. Shared by the dEdt/dPdt/dJdt reductions.
+        Usage: H=surrkick.surrkick().Hstack'''
+
+        if self._Hstack is None:
+            offset=self.lmax+1
+            self._Hstack=np.zeros((self.lmax+2,2*self.lmax+3,len(self.times)),dtype=np.complex128)
+            for (l,m),v in self.hsample.items():
+                self._Hstack[l,m+offset]=v
+        return self._Hstack
+
+    @property
+    def Hdstack(self):
+        '''Strain derivatives arranged in a zero-padded 3D array of shape (lmax+2,2*lmax+3,T) indexed by (l,m+lmax+1). Slots outside the physical modes stay zero, so mode sums can run over the full array and the l+-1, m+-1 couplings become plain slice shifts.
+        Usage: Hd=surrkick.surrkick().Hdstack'''
+
+        if self._Hdstack is None:
+            offset=self.lmax+1
+            self._Hdstack=np.zeros((self.lmax+2,2*self.lmax+3,len(self.times)),dtype=np.complex128)
+            for (l,m),v in self.hdotsample.items():
+                self._Hdstack[l,m+offset]=v
+        return self._Hdstack
+
+    def _compute_all(self):
+        '''Fill all the flux and radiated-quantity caches in one shot. The three fluxes share the stacked mode arrays and their conjugate/shifted intermediates (or a single fused numba kernel), so typical usage (e.g. asking for kick after Erad) never rebuilds the stacks. The cumulative integrals and final scalars follow through the lazy properties, which are cheap once the fluxes are cached.'''
+
+        if self._dEdt is None or self._dPdt is None or self._dJdt is None:
+
+            A,B,C,D,F = self.coeffs.tables(self.lmax)
+
+            if njit is not None:
+                dEdt,dPxdt,dPydt,dPzdt,dJxdt,dJydt,dJzdt = _fluxes_kernel(self.Hstack,self.Hdstack,A,B,C,D,F,self.lmax)
+                self._dEdt = dEdt
+                self._dPdt = np.ascontiguousarray(np.stack([dPxdt,dPydt,dPzdt],axis=1))
+                self._dJdt = np.ascontiguousarray(np.stack([dJxdt,dJydt,dJzdt],axis=1))
+
+            else:
+                H = self.Hstack
+                Hd = self.Hdstack
+                Hdc = np.conj(Hd)
+                Bflip = B[:,::-1]          # b(l,-m)
+                Bp1 = shiftmodes(B,1,1)    # b(l+1,m+1)
+                Dp1 = shiftmodes(D,1,0)    # d(l+1,m)
+                Fflip = F[:,::-1]          # f(l,-m)
+                Hdc_mp1 = shiftmodes(Hdc,0,1)
+                Hdc_mm1 = shiftmodes(Hdc,0,-1)
+                marr = np.arange(-(self.lmax+1),self.lmax+2)
+
+                # Eq. 3.8, summed over all modes at once
+                self._dEdt = _abs2(Hd).sum(axis=(0,1)) * _INV_16PI
+
+                # Eq. 3.14. dPpdt= dPxdt + i dPydt. The mode couplings hdot(l+-1,m+1) are slice shifts of the zero-padded stack.
+                dPpdt = _INV_8PI * ( Hd * ( A[...,None]*Hdc_mp1 + Bflip[...,None]*shiftmodes(Hdc,-1,1) - Bp1[...,None]*shiftmodes(Hdc,1,1) ) ).sum(axis=(0,1))
+                # Eq. 3.15
+                dPzdt = _INV_16PI * ( Hd * ( C[...,None]*Hdc + D[...,None]*shiftmodes(Hdc,-1,0) + Dp1[...,None]*shiftmodes(Hdc,1,0) ) ).sum(axis=(0,1))
+
+                dPxdt=dPpdt.real # From the definition of Pplus
+                dPydt=dPpdt.imag # From the definition of Pplus
+
+                if __debug__: # Check... Stripped together with its O(T) scan when running python -O
+                    assert np.abs(dPzdt.imag).max()<1e-6
+                dPzdt=dPzdt.real # Kill the imaginary part
+
+                self._dPdt = np.ascontiguousarray(np.stack([dPxdt,dPydt,dPzdt],axis=1))
+
+                # Eq. 3.22
+                dJxdt = _INV_32PI * ( H * ( F[...,None]*Hdc_mp1 + Fflip[...,None]*Hdc_mm1 ) ).sum(axis=(0,1))
+                # Eq. 3.23
+                dJydt = -_INV_32PI * ( H * ( F[...,None]*Hdc_mp1 - Fflip[...,None]*Hdc_mm1 ) ).sum(axis=(0,1))
+                # Eq. 3.24
+                dJzdt = _INV_16PI * ( marr[None,:,None] * H * Hdc ).sum(axis=(0,1))
+
+                self._dJdt = np.ascontiguousarray(np.stack([dJxdt.imag,dJydt.real,dJzdt.imag],axis=1))
+
+        # Touch the downstream lazy properties so everything is cached after one call
+        self.Erad
+        self.Prad
+        self.Jrad
+        self.kick
+        self.xoft
 
     @property
     def dEdt(self):
-        '''Implement Eq. (3.8) of arXiv:0707.4654 for the energy momentum flux. Note that the modes provided by the surrogate models are actually h*(r/M) extracted as r=infinity, so the r^2 factor is already in there.
+        '''Implement Eq. (3.8) of arXiv:0707.4654 for the energy momentum flux. Note that the modes provided by the surrogate models are actually h*(r/M) extracted as r=infinity, so the r^2 factor is already in there. The mode sum is performed as a single vectorized reduction over the stacked Hdot array.
         Usage: dEdt=surrkick.surrkick().dEdt
         '''
 
         if self._dEdt is None:
-            dEdt = 0
-            for l,m in summodes.single(self.lmax):
-
-                # Eq. (3.8)
-                dEdt += (1/(16*np.pi)) * np.abs(self.hdot(l,m))**2
-
-            self._dEdt = dEdt
+            self._compute_all()
 
         return self._dEdt
 
@@ -332,8 +527,7 @@ class surrkick(object):
 
         if self._Eoft is None:
             # The integral of a spline is called antiderivative (mmmh...)
-            origin=0
-            self._Eoft = spline(self.times,self.dEdt).antiderivative()(self.times)-origin
+            self._Eoft = antiderivative(self.times,self.dEdt)
 
             flag_2PN=False
 
@@ -341,7 +535,8 @@ class surrkick(object):
                 #Estimate energy radiated before the start of the simulation using 0PN result (Peters 64)
                 tbuffer=100
                 tend=self.times[0]+tbuffer
-                Edot0 = spline(self.times[self.times<tend],self.dEdt[self.times<tend]).antiderivative()(tend)/tbuffer
+                iend=np.searchsorted(self.times,tend)
+                Edot0 = CubicSpline(self.times[:iend],self.dEdt[:iend]).antiderivative()(tend)/tbuffer
                 E0 = ( (5./1024.) *(self.q/(1.+self.q)**2.)**3. * Edot0 )**(1./5.)
                 self._Eoft+=E0
 
@@ -424,24 +619,7 @@ class surrkick(object):
         Usage: dPdt=surrkick.surrkick().dPdt'''
 
         if self._dPdt is None:
-
-            dPpdt = 0
-            dPzdt = 0
-
-            for l,m in summodes.single(self.lmax):
-
-                # Eq. 3.14. dPpdt= dPxdt + i dPydt
-                dPpdt += (1/(8*np.pi)) * self.hdot(l,m) * ( self.coeffs.a(l,m) * np.conj(self.hdot(l,m+1)) + self.coeffs.b(l,-m) * np.conj(self.hdot(l-1,m+1)) - self.coeffs.b(l+1,m+1) * np.conj(self.hdot(l+1,m+1)) )
-                # Eq. 3.15
-                dPzdt += (1/(16*np.pi)) * self.hdot(l,m) * ( self.coeffs.c(l,m) * np.conj(self.hdot(l,m)) + self.coeffs.d(l,m) * np.conj(self.hdot(l-1,m)) + self.coeffs.d(l+1,m) * np.conj(self.hdot(l+1,m)) )
-
-            dPxdt=dPpdt.real # From the definition of Pplus
-            dPydt=dPpdt.imag # From the definition of Pplus
-
-            assert max(dPzdt.imag)<1e-6 # Check...
-            dPzdt=dPzdt.real # Kill the imaginary part
-
-            self._dPdt = np.transpose([dPxdt,dPydt,dPzdt])
+            self._compute_all()
 
         return self._dPdt
 
@@ -451,14 +629,14 @@ class surrkick(object):
         Usage: Poft=surrkick.surrkick().Poft'''
 
         if self._Poft is None:
-            # The integral of a spline is called antiderivative (mmmh...)
-            origin=[0,0,0]
-            self._Poft = np.transpose([spline(self.times,v).antiderivative()(self.times)-o  for v,o in zip(np.transpose(self.dPdt),origin)])
+            # The integral of a spline is called antiderivative (mmmh...). All three components in one batched spline.
+            self._Poft = antiderivative(self.times,self.dPdt)
 
-            # Eliminate unphysical drift due to the starting point of the integration. Integrate for tbuffer and substract the mean.
+            # Eliminate unphysical drift due to the starting point of the integration. Integrate for tbuffer and substract the mean. One batched spline covers all three components.
             tbuffer=1000
             tend=self.times[0]+tbuffer
-            P0 = np.array([spline(self.times[self.times<tend],v[self.times<tend]).antiderivative()(tend)/tbuffer  for v in np.transpose(self._Poft)])
+            iend=np.searchsorted(self.times,tend)
+            P0 = CubicSpline(self.times[:iend],self._Poft[:iend],axis=0).antiderivative()(tend)/tbuffer
             self._Poft-=P0
 
         return self._Poft
@@ -479,7 +657,7 @@ class surrkick(object):
         Usage: voft=surrkick.surrkick().voft'''
 
         if self._voft is None:
-            self._voft= np.array([-x/y for x,y in zip(self.Poft,self.Moft)])
+            self._voft= -self.Poft/self.Moft[:,None]
 
         return self._voft
 
@@ -514,25 +692,7 @@ class surrkick(object):
         Usage: dPdt=surrkick.surrkick().dPdt'''
 
         if self._dJdt is None:
-
-            dJxdt = 0
-            dJydt = 0
-            dJzdt = 0
-
-            for l,m in summodes.single(self.lmax):
-
-                # Eq. 3.22
-                dJxdt += (1/(32*np.pi)) * self.h(l,m) * ( self.coeffs.f(l,m) * np.conj(self.hdot(l,m+1)) + self.coeffs.f(l,-m) * np.conj(self.hdot(l,m-1)) )
-                # Eq. 3.23
-                dJydt += (-1/(32*np.pi)) * self.h(l,m) * ( self.coeffs.f(l,m) * np.conj(self.hdot(l,m+1)) - self.coeffs.f(l,-m) * np.conj(self.hdot(l,m-1)) )
-                # Eq. 3.24
-                dJzdt += (1/(16*np.pi)) * m * self.h(l,m) * np.conj(self.hdot(l,m))
-
-            dJxdt=dJxdt.imag
-            dJydt=dJydt.real
-            dJzdt=dJzdt.imag
-
-            self._dJdt = np.transpose([dJxdt,dJydt,dJzdt])
+            self._compute_all()
 
         return self._dJdt
 
@@ -543,9 +703,8 @@ class surrkick(object):
 
         if self._Joft is None:
 
-            # The integral of a spline is called antiderivative (mmmh...)
-            origin=[0,0,0]
-            self._Joft = np.transpose([spline(self.times,v).antiderivative()(self.times)-o  for v,o in zip(np.transpose(self.dJdt),origin)])
+            # The integral of a spline is called antiderivative (mmmh...). All three components in one batched spline.
+            self._Joft = antiderivative(self.times,self.dJdt)
 
         return self._Joft
 
@@ -564,17 +723,110 @@ class surrkick(object):
         Usage: xoft=surrkick.surrkick().xoft'''
 
         if self._xoft is None:
-            # The integral of a spline is called antiderivative (mmmh...)
-            origin=[0,0,0]
-            self._xoft = np.transpose([spline(self.times,v).antiderivative()(self.times)-vo*self.times  for v,vo in zip(np.transpose(self.voft),origin)])
+            # The integral of a spline is called antiderivative (mmmh...). All three components in one batched spline.
+            self._xoft = antiderivative(self.times,self.voft)
         return self._xoft
 
+    @classmethod
+    def batch(cls,q,chi1,chi2,**kwargs):
+        '''Evaluate a batch of binaries in a single call and return their kick vectors as an array of shape (N,3). `q`, `chi1` and `chi2` are arrays of shape (N,), (N,3) and (N,3); additional keyword arguments are forwarded to the constructor. Binaries are evaluated in parallel over the available cores.
+        Usage: kickcomp=surrkick.surrkick.batch(q,chi1,chi2)'''
+
+        q=np.asarray(q)
+        chi1=np.asarray(chi1)
+        chi2=np.asarray(chi2)
+        def _eval(i):
+            return i,cls(q=q[i],chi1=chi1[i],chi2=chi2[i],**kwargs).kickcomp
+        ncpu=multiprocessing.cpu_count()
+        pool=pathos.multiprocessing.ProcessingPool(ncpu)
+        out=np.empty((len(q),3))
+        # Dispatch in bounded partitions: only one partition of pickled results is ever in flight, so peak memory does not grow with N
+        CHUNK=256
+        progress=tqdm(total=len(q),miniters=max(1,len(q)//100),mininterval=0.5,smoothing=0)
+        for start in range(0,len(q),CHUNK):
+            end=min(start+CHUNK,len(q))
+            for i,kc in pool.uimap(_eval,range(start,end),chunksize=max(1,CHUNK//(4*ncpu))):
+                out[i]=kc
+                progress.update(1)
+        progress.close()
+        return out
+
+
+# Precompute the coefficient tables at import time. NRSur7dq2 has lmax=4, so lmax=5 covers every l+1 term ever needed; the tables are exposed as class attributes (indexed by (l,m+6)) and the per-lmax tables used internally are warmed through the lru cache.
+surrkick.coeffs.A,surrkick.coeffs.B,surrkick.coeffs.C,surrkick.coeffs.D,surrkick.coeffs.F = surrkick.coeffs.tables(5)
+for _lmax in (2,3,4):
+    surrkick.coeffs.tables(_lmax)
+
+
+if njit is not None:
+    @njit(cache=True,fastmath=True)
+    def _project_fast(v,d):
+        '''Compiled (N,3)x(3,) dot product, bypassing the broadcasting machinery.'''
+        n=v.shape[0]
+        out=np.empty(n)
+        d0,d1,d2=d[0],d[1],d[2]
+        for i in range(n):
+            out[i]=v[i,0]*d0+v[i,1]*d1+v[i,2]*d2
+        return out
+
+
+if njit is not None:
+    @njit(parallel=True,fastmath=True,cache=True)
+    def _scalespins_kernel(vec,mag):
+        '''Normalize each row of vec in place and rescale it to the magnitude in mag.'''
+        for i in prange(vec.shape[0]):
+            s=mag[i]/np.sqrt(vec[i,0]**2+vec[i,1]**2+vec[i,2]**2)
+            vec[i,0]*=s
+            vec[i,1]*=s
+            vec[i,2]*=s
+
+
+def plothist(axes,data,color,nbins=100,label=None):
+    '''Histogram `data` once with np.histogram and draw the usual outline+filled pair with stairs artists on each axis in `axes` (a single axis is also accepted). Binning in numpy avoids matplotlib re-binning the sample for every artist.
+    Usage: surrkick.plothist(axes,data,color)'''
+
+    counts,edges=np.histogram(data,bins=nbins,density=True)
+    if not isinstance(axes,(list,tuple)): axes=[axes]
+    for ax in axes:
+        ax.stairs(counts,edges,color=color,lw=2,alpha=0.8,label=label)
+        ax.stairs(counts,edges,color=color,alpha=0.2,fill=True)
+
+
+def minorticks(*axes):
+    '''Switch on automatic minor ticks on both dimensions of every axis passed. Each axis gets its own AutoMinorLocator instance: locators bind to a single axis through set_axis, so one instance cannot be shared.
+    Usage: surrkick.minorticks(ax1,ax2,...)'''
+
+    for ax in axes:
+        ax.xaxis.set_minor_locator(AutoMinorLocator())
+        ax.yaxis.set_minor_locator(AutoMinorLocator())
+
 
 def project(timeseries,direction):
     '''Project a 3D time series along some direction.
     Usage projection=project(timeseries, direction)'''
 
-    return np.array([np.dot(t,direction) for t in timeseries])
+    timeseries=np.asarray(timeseries)
+    direction=np.asarray(direction)
+    if njit is not None and timeseries.ndim==2 and direction.ndim==1 \
+            and timeseries.dtype==np.float64 and direction.dtype==np.float64:
+        return _project_fast(timeseries,direction)
+    return timeseries @ direction
+
+
+def randomspins(dim,mag=None,rng=None):
+    '''Draw a batch of isotropic spin vectors, returned as an array of shape (dim,3). With mag=None the magnitudes are distributed uniformly in volume up to 0.8; otherwise every vector has the given magnitude. Drawing in bulk is much faster than calling the RNG once per binary.
+    Usage: chi=surrkick.randomspins(dim,mag=None)'''
+
+    if rng is None: rng=np.random.default_rng()
+    # Normalized Gaussians are isotropic: one sqrt per vector instead of five trig calls
+    vec=rng.standard_normal((dim,3))
+    mag=np.broadcast_to(np.asarray(0.8*np.cbrt(rng.uniform(0,1,dim)) if mag is None else mag,dtype=np.float64),(dim,))
+    if njit is not None:
+        # Compiled kernel: normalize and rescale in one threaded pass, no temporaries
+        _scalespins_kernel(vec,np.ascontiguousarray(mag))
+        return vec
+    vec/=np.linalg.norm(vec,axis=1,keepdims=True)
+    return vec*np.reshape(mag,(-1,1))
 
 
 @np.vectorize
@@ -613,6 +865,68 @@ def maxalpha(q=1,chi1mag=0,chi2mag=0.,theta1=0.,theta2=0.,deltaphi=0.,t_ref=-100
 
 
 
+_framefigs={}
+'''Per-process cache of reusable matplotlib figures for frame rendering. Pool workers clear and redraw a cached figure instead of constructing a fresh one for every frame.'''
+
+
+def _nospinprofiles_eval(q):
+    '''Evaluate a non-spinning binary and return only the arrays needed by plots.nospinprofiles. Defined at module level so it can be dispatched to a process pool; returning plain arrays avoids pickling the surrogate state.
+    Usage: times,voft,Eoft,Joft,kickdir=_nospinprofiles_eval(q)'''
+
+    b = surrkick(q=q)
+    return b.times, b.voft, b.Eoft, b.Joft, b.kickdir
+
+
+@lru_cache(maxsize=None)
+def _load_nr(path):
+    '''Load an NR kicks table. The text file is converted to an .npy binary next to it the first time it is seen, and the parsed array is cached in memory so each table is read at most once per session.
+    Usage: nr_data=surrkick._load_nr(path)'''
+
+    binpath=os.path.splitext(path)[0]+'.npy'
+    if not os.path.isfile(binpath):
+        np.save(binpath,np.loadtxt(path))
+    return np.load(binpath)
+
+
+@lru_cache(maxsize=8192)
+def _kick_cached(q,c1x,c1y,c1z,c2x,c2y,c2z,t_ref):
+    '''Memoized kick magnitude for a single binary. Callers quantize the parameters (round to 1e-6) so that near-identical configurations hit the cache instead of re-evaluating the surrogate.
+    Usage: kick=surrkick._kick_cached(q,c1x,c1y,c1z,c2x,c2y,c2z,t_ref)'''
+
+    return surrkick(q=q,chi1=[c1x,c1y,c1z],chi2=[c2x,c2y,c2z],t_ref=t_ref).kick
+
+
+def _nr_surr_comparison_data_helper(nr_data, t):
+    '''Evaluate the surrogate kick for every row of an NR kicks table, in parallel. Shared by the NR comparison plots.
+    Usage: kicks=surrkick._nr_surr_comparison_data_helper(nr_data,t)'''
+
+    def _kick(i):
+        # Quantized tuple key: duplicate configurations in the table are evaluated once per worker
+        d = np.round(nr_data[i],6)
+        return i, _kick_cached(d[2],d[3],d[4],d[5],d[6],d[7],d[8],t)
+    pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+    kicks = np.empty(len(nr_data))
+    for i,k in tqdm(pool.uimap(_kick,range(len(nr_data))),total=len(nr_data),miniters=max(1,len(nr_data)//100),mininterval=0.5,smoothing=0):
+        kicks[i]=k
+    return kicks
+
+
+@lru_cache(maxsize=None)
+def _nr_surr_cached(t):
+    '''Surrogate kicks for the NR comparison table at reference time t. Computed and stored as an .npy binary the first time (legacy pickles from older runs are honoured) and memoized so the plots sharing a reference time load the array once per session.
+    Usage: kicks=surrkick._nr_surr_cached(t)'''
+
+    filename='nr_comparison_kicks_t%d.npy'%abs(t)
+    legacy=filename.replace('.npy','.pkl')
+    if not os.path.isfile(filename) and os.path.isfile(legacy):
+        with open(legacy, 'rb') as f: return pickle.load(f)
+    if not os.path.isfile(filename):
+        print("Storing data:", filename)
+        nr_data=_load_nr(os.path.dirname(os.path.abspath(__file__))+"/nr_comparison_data/nr_kicks_t%d.dat"%abs(t))
+        np.save(filename,_nr_surr_comparison_data_helper(nr_data, t))
+    return np.load(filename,mmap_mode='r')
+
+
 class plots(object):
     '''Reproduce plots of our paper: Black-hole kicks from numerical-relativity surrogate models'''
 
@@ -623,7 +937,7 @@ class plots(object):
             print("Plotting:", function.__name__+".pdf")
 
             # Before function call
-            global plt,AutoMinorLocator,MultipleLocator,LogLocator,NullFormatter
+            global plt,AutoMinorLocator,MultipleLocator,LogLocator,NullFormatter,withStroke,LineCollection
             from matplotlib import use #Useful when working on SSH
             use('Agg')
             from matplotlib import rc
@@ -641,6 +955,8 @@ class plots(object):
             from mpl_toolkits.mplot3d import Axes3D
             from matplotlib.backends.backend_pdf import PdfPages
             from matplotlib.ticker import AutoMinorLocator,MultipleLocator,LogLocator,NullFormatter
+            from matplotlib.patheffects import withStroke
+            from matplotlib.collections import LineCollection
             pp= PdfPages(function.__name__+".pdf")
 
             fig = function(self)
@@ -707,6 +1023,10 @@ class plots(object):
                             warnings.simplefilter(action='ignore', category=FutureWarning)
                             framename = function.__name__+"_"+str(j)+"_"+"%05d.png"%i
                             if not encodeonly:
+                                # Functions may stream frames to disk themselves and return paths
+                                if isinstance(f,str):
+                                    assert f==framename
+                                    continue
                                 f.savefig(framename, bbox_inches='tight',format='png',dpi = 300)
                                 f.clf()
                                 plt.close(f)
@@ -756,19 +1076,21 @@ class plots(object):
         axPt = [ax.twinx() for ax in axP]
 
         q_vals = np.linspace(1,0.5,8)
-        for i,q in enumerate(tqdm(q_vals)):
+        # Each surrkick evaluation is independent: run them in parallel and keep only the arrays needed for plotting
+        pool = pathos.multiprocessing.ProcessingPool(min(multiprocessing.cpu_count(),len(q_vals)))
+        results = list(tqdm(pool.imap(_nospinprofiles_eval,q_vals),total=len(q_vals)))
+        for i,(times,voft,Eoft,Joft,kickdir) in enumerate(results):
             color=plt.cm.copper(i/len(q_vals))
-            b = surrkick(q=q)
             dashes=''
-            axP[0].plot(b.times,b.voft[:,0]*1000,color=color,alpha=0.9,dashes=dashes)
-            axP[1].plot(b.times,b.voft[:,1]*1000,color=color,alpha=0.9,dashes=dashes)
-            axP[2].plot(b.times,b.voft[:,2]*1000,color=color,alpha=0.9,dashes=dashes)
-            axP[3].plot(b.times,project(b.voft,b.kickdir)*1000,color=color,alpha=0.9,dashes=dashes)
-            axE.plot(b.times,b.Eoft,color=color,alpha=0.7)
-            axJ[0].plot(b.times,b.Joft[:,0],color=color,alpha=0.7,dashes=dashes)
-            axJ[1].plot(b.times,b.Joft[:,1],color=color,alpha=0.7,dashes=dashes)
-            axJ[2].plot(b.times,b.Joft[:,2],color=color,alpha=0.7,dashes=dashes)
-            axJ[3].plot(b.times,project(b.Joft,b.Joft[-1]),color=color,alpha=0.7,dashes=dashes)
+            axP[0].plot(times,voft[:,0]*1000,color=color,alpha=0.9,dashes=dashes)
+            axP[1].plot(times,voft[:,1]*1000,color=color,alpha=0.9,dashes=dashes)
+            axP[2].plot(times,voft[:,2]*1000,color=color,alpha=0.9,dashes=dashes)
+            axP[3].plot(times,project(voft,kickdir)*1000,color=color,alpha=0.9,dashes=dashes)
+            axE.plot(times,Eoft,color=color,alpha=0.7)
+            axJ[0].plot(times,Joft[:,0],color=color,alpha=0.7,dashes=dashes)
+            axJ[1].plot(times,Joft[:,1],color=color,alpha=0.7,dashes=dashes)
+            axJ[2].plot(times,Joft[:,2],color=color,alpha=0.7,dashes=dashes)
+            axJ[3].plot(times,project(Joft,Joft[-1]),color=color,alpha=0.7,dashes=dashes)
 
         for ax in axP+[axE]+axJ:
             ax.set_xlim(-50,50)
@@ -815,8 +1137,9 @@ class plots(object):
             chi2=[0,0,0]
 
             sk = surrkick(q=q , chi1=chi1,chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft[np.logical_and(sk.times>-4000,sk.times<25.5)])
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            i_lo,i_hi=np.searchsorted(sk.times,[-4000,25.5])
+            x,y,z=sk.xoft[i_lo:i_hi].T
             ax.plot(x-x0,y-y0,z-z0)
             ax.scatter(0,0,0,marker='.',s=60,alpha=0.5)
             x,y,z=np.transpose(sk.xoft)
@@ -858,8 +1181,9 @@ class plots(object):
             chi2=[-0.8,0,0]
 
             sk = surrkick(q=q , chi1=chi1, chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft[np.logical_and(sk.times>-3500,sk.times<16)])
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            i_lo,i_hi=np.searchsorted(sk.times,[-3500,16])
+            x,y,z=sk.xoft[i_lo:i_hi].T
             ax.plot(x-x0,y-y0,z-z0)
             ax.scatter(0,0,0,marker='.',s=40,alpha=0.5)
             x,y,z=np.transpose(sk.xoft)
@@ -903,8 +1227,9 @@ class plots(object):
             chi2=np.array(chi2)*0.8/np.linalg.norm(chi2)
 
             sk = surrkick(q=q , chi1=chi1, chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft[np.logical_and(sk.times>-4500,sk.times<7)])
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            i_lo,i_hi=np.searchsorted(sk.times,[-4500,7])
+            x,y,z=sk.xoft[i_lo:i_hi].T
             ax.plot(x-x0,y-y0,z-z0)
             ax.scatter(0,0,0,marker='.',s=40,alpha=0.5)
             x,y,z=np.transpose(sk.xoft)
@@ -961,31 +1286,32 @@ class plots(object):
             chi1=[0,0,0]
             chi2=[0,0,0]
             sk = surrkick(q=q , chi1=chi1,chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft)
-            xnew=spline(sk.times,x)(tnew)
-            ynew=spline(sk.times,y)(tnew)
-            znew=spline(sk.times,z)(tnew)
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            # One batched spline for all three components: the tridiagonal factorization on sk.times is shared
+            xnew,ynew,znew=CubicSpline(sk.times,sk.xoft,axis=0)(tnew).T
             tmax=100 # Fix annyoing bug in matplotlib.axes3d (comes from a 2d backend)
-            temp=xnew[tnew<tmax]
-            xnew=np.append(temp,temp[-1]*np.ones(len(xnew[tnew>=tmax])))
-            temp=ynew[tnew<tmax]
-            ynew=np.append(temp,temp[-1]*np.ones(len(ynew[tnew>=tmax])))
-            temp=znew[tnew<tmax]
-            znew=np.append(temp,temp[-1]*np.ones(len(znew[tnew>=tmax])))
-
-            def _recoil(tilltime):
-                fig = plt.figure(figsize=(6,6))
-                ax=fig.add_axes([0,0,0.7,0.7], projection='3d')
+            idx=np.searchsorted(tnew,tmax)
+            xnew[idx:]=xnew[idx-1]
+            ynew[idx:]=ynew[idx-1]
+            znew[idx:]=znew[idx-1]
+
+            def _recoil(i):
+                tilltime=tnew[i]
+                # Build the figure once per worker process and clear it between frames
+                if 'recoil' not in _framefigs:
+                    fig = plt.figure(figsize=(6,6))
+                    _framefigs['recoil']=(fig,fig.add_axes([0,0,0.7,0.7], projection='3d'))
+                fig,ax=_framefigs['recoil']
+                ax.cla()
+                for txt in list(fig.texts): txt.remove()
                 fig.text(0.25,0.67,'$t='+str(int(tilltime))+'M$',transform=fig.transFigure, horizontalalignment='left',verticalalignment='bottom')
-                x=xnew[tnew<tilltime]
-                y=ynew[tnew<tilltime]
-                z=znew[tnew<tilltime]
+                k=np.searchsorted(tnew,tilltime)
+                x=xnew[:k]
+                y=ynew[:k]
+                z=znew[:k]
                 ax.plot(x-x0,y-y0,z-z0)
                 if tilltime>0:
                     ax.scatter(0,0,0,marker='.',s=60,alpha=0.5)
-                x,y,z=np.transpose(sk.xoft)
-                vx,vy,vz=np.transpose(sk.voft)
                 ax.set_xlim(-0.004,0.0045)
                 ax.set_ylim(-0.0025,0.006)
                 ax.set_zlim(-0.006,0.0035)
@@ -1002,9 +1328,13 @@ class plots(object):
                 ax.xaxis.set_minor_locator(AutoMinorLocator())
                 ax.yaxis.set_minor_locator(AutoMinorLocator())
                 ax.zaxis.set_minor_locator(AutoMinorLocator())
-                return fig
+                framename="recoil_0_%05d.png"%i
+                fig.savefig(framename,bbox_inches='tight',format='png',dpi=300)
+                return framename
 
-            figs=[_recoil(t) for t in tqdm(tnew)]
+            # Frames are independent: render them in parallel and stream each straight to disk, returning the path. pathos serializes the local closure with dill, so no top-level refactor is needed.
+            pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+            figs = list(tqdm(pool.imap(_recoil,range(len(tnew))),total=len(tnew)))
             allfig.append(figs)
 
         else:
@@ -1017,31 +1347,32 @@ class plots(object):
             chi1=[0.8,0,0]
             chi2=[-0.8,0,0]
             sk = surrkick(q=q , chi1=chi1,chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft)
-            xnew=spline(sk.times,x)(tnew)
-            ynew=spline(sk.times,y)(tnew)
-            znew=spline(sk.times,z)(tnew)
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            # One batched spline for all three components: the tridiagonal factorization on sk.times is shared
+            xnew,ynew,znew=CubicSpline(sk.times,sk.xoft,axis=0)(tnew).T
             tmax=50 # Fix annyoing bug in matplotlib.axes3d (comes from a 2d backend)
-            temp=xnew[tnew<tmax]
-            xnew=np.append(temp,temp[-1]*np.ones(len(xnew[tnew>=tmax])))
-            temp=ynew[tnew<tmax]
-            ynew=np.append(temp,temp[-1]*np.ones(len(ynew[tnew>=tmax])))
-            temp=znew[tnew<tmax]
-            znew=np.append(temp,temp[-1]*np.ones(len(znew[tnew>=tmax])))
-
-            def _recoil(tilltime):
-                fig = plt.figure(figsize=(6,6))
-                ax=fig.add_axes([0,0,0.7,0.7], projection='3d')
+            idx=np.searchsorted(tnew,tmax)
+            xnew[idx:]=xnew[idx-1]
+            ynew[idx:]=ynew[idx-1]
+            znew[idx:]=znew[idx-1]
+
+            def _recoil(i):
+                tilltime=tnew[i]
+                # Build the figure once per worker process and clear it between frames
+                if 'recoil' not in _framefigs:
+                    fig = plt.figure(figsize=(6,6))
+                    _framefigs['recoil']=(fig,fig.add_axes([0,0,0.7,0.7], projection='3d'))
+                fig,ax=_framefigs['recoil']
+                ax.cla()
+                for txt in list(fig.texts): txt.remove()
                 fig.text(0.25,0.67,'$t='+str(int(tilltime))+'M$',transform=fig.transFigure, horizontalalignment='left',verticalalignment='bottom')
-                x=xnew[tnew<tilltime]
-                y=ynew[tnew<tilltime]
-                z=znew[tnew<tilltime]
+                k=np.searchsorted(tnew,tilltime)
+                x=xnew[:k]
+                y=ynew[:k]
+                z=znew[:k]
                 ax.plot(x-x0,y-y0,z-z0)
                 if tilltime>0:
                     ax.scatter(0,0,0,marker='.',s=60,alpha=0.5)
-                x,y,z=np.transpose(sk.xoft)
-                vx,vy,vz=np.transpose(sk.voft)
                 ax.set_xlim(-0.005,0.005)
                 ax.set_ylim(-0.005,0.005)
                 ax.set_zlim(-0.005,0.005)
@@ -1058,9 +1389,13 @@ class plots(object):
                 ax.xaxis.set_minor_locator(AutoMinorLocator())
                 ax.yaxis.set_minor_locator(AutoMinorLocator())
                 ax.zaxis.set_minor_locator(AutoMinorLocator())
-                return fig
+                framename="recoil_1_%05d.png"%i
+                fig.savefig(framename,bbox_inches='tight',format='png',dpi=300)
+                return framename
 
-            figs=[_recoil(t) for t in tqdm(tnew)]
+            # Frames are independent: render them in parallel and stream each straight to disk, returning the path. pathos serializes the local closure with dill, so no top-level refactor is needed.
+            pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+            figs = list(tqdm(pool.imap(_recoil,range(len(tnew))),total=len(tnew)))
             allfig.append(figs)
 
         else:
@@ -1075,31 +1410,32 @@ class plots(object):
             chi2=[-0.87810809, 0.06485156, 0.47404689]
             chi2=np.array(chi2)*0.8/np.linalg.norm(chi2)
             sk = surrkick(q=q , chi1=chi1,chi2=chi2)
-            x0,y0,z0=sk.xoft[sk.times==min(abs(sk.times))][0]
-            x,y,z=np.transpose(sk.xoft)
-            xnew=spline(sk.times,x)(tnew)
-            ynew=spline(sk.times,y)(tnew)
-            znew=spline(sk.times,z)(tnew)
+            x0,y0,z0=sk.xoft[np.abs(sk.times).argmin()]
+            # One batched spline for all three components: the tridiagonal factorization on sk.times is shared
+            xnew,ynew,znew=CubicSpline(sk.times,sk.xoft,axis=0)(tnew).T
             tmax=30 # Fix annyoing bug in matplotlib.axes3d (comes from a 2d backend)
-            temp=xnew[tnew<tmax]
-            xnew=np.append(temp,temp[-1]*np.ones(len(xnew[tnew>=tmax])))
-            temp=ynew[tnew<tmax]
-            ynew=np.append(temp,temp[-1]*np.ones(len(ynew[tnew>=tmax])))
-            temp=znew[tnew<tmax]
-            znew=np.append(temp,temp[-1]*np.ones(len(znew[tnew>=tmax])))
-
-            def _recoil(tilltime):
-                fig = plt.figure(figsize=(6,6))
-                ax=fig.add_axes([0,0,0.7,0.7], projection='3d')
+            idx=np.searchsorted(tnew,tmax)
+            xnew[idx:]=xnew[idx-1]
+            ynew[idx:]=ynew[idx-1]
+            znew[idx:]=znew[idx-1]
+
+            def _recoil(i):
+                tilltime=tnew[i]
+                # Build the figure once per worker process and clear it between frames
+                if 'recoil' not in _framefigs:
+                    fig = plt.figure(figsize=(6,6))
+                    _framefigs['recoil']=(fig,fig.add_axes([0,0,0.7,0.7], projection='3d'))
+                fig,ax=_framefigs['recoil']
+                ax.cla()
+                for txt in list(fig.texts): txt.remove()
                 fig.text(0.25,0.67,'$t='+str(int(tilltime))+'M$',transform=fig.transFigure, horizontalalignment='left',verticalalignment='bottom')
-                x=xnew[tnew<tilltime]
-                y=ynew[tnew<tilltime]
-                z=znew[tnew<tilltime]
+                k=np.searchsorted(tnew,tilltime)
+                x=xnew[:k]
+                y=ynew[:k]
+                z=znew[:k]
                 ax.plot(x-x0,y-y0,z-z0)
                 if tilltime>0:
                     ax.scatter(0,0,0,marker='.',s=60,alpha=0.5)
-                x,y,z=np.transpose(sk.xoft)
-                vx,vy,vz=np.transpose(sk.voft)
                 ax.set_xlim(-0.006,0.005)
                 ax.set_ylim(-0.006,0.005)
                 ax.set_zlim(0,0.011)
@@ -1120,9 +1456,13 @@ class plots(object):
                 ax.xaxis.set_minor_locator(AutoMinorLocator())
                 ax.yaxis.set_minor_locator(AutoMinorLocator())
                 ax.zaxis.set_minor_locator(AutoMinorLocator())
-                return fig
+                framename="recoil_2_%05d.png"%i
+                fig.savefig(framename,bbox_inches='tight',format='png',dpi=300)
+                return framename
 
-            figs=[_recoil(t) for t in tqdm(tnew)]
+            # Frames are independent: render them in parallel and stream each straight to disk, returning the path. pathos serializes the local closure with dill, so no top-level refactor is needed.
+            pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+            figs = list(tqdm(pool.imap(_recoil,range(len(tnew))),total=len(tnew)))
             allfig.append(figs)
 
         else:
@@ -1161,8 +1501,9 @@ class plots(object):
         dashes=['',[15,5],[8,5],[2,2],[0.5,1]]
         cols=['C0','C1','C2','C3','black']
         for sk,fk,l,d,c in tqdm(zip(sks,fks,labels,dashes,cols)):
-            ax.plot(sk.times,sk.Eoft,alpha=0.4,lw=1,c=c)
-            ax.plot(sk.times,sk.Eoft,alpha=1,lw=2,c=c,dashes=d,label=l)
+            # One artist per curve: the faint solid underlay is a stroke behind the dashed line
+            pe=[withStroke(linewidth=3,foreground=c,alpha=0.4)]
+            ax.plot(sk.times,sk.Eoft,lw=2,c=c,dashes=d,label=l,path_effects=pe)
                 #ax.axhline((1-fk)*(1+sk.Eoft[0]),c=c,dashes=d)
 
         ax.legend(loc="upper left",fontsize=11,handlelength=5.5)
@@ -1201,14 +1542,14 @@ class plots(object):
             dashes=['',[15,5],[8,5],[2,2]]
             cols=['C0','C1','C2','C3']
             for sk,l,d,c in tqdm(zip(sks,labels,dashes,cols)):
-                axs[0].plot(sk.times,1./0.001*project(sk.voft,[1,0,0]),alpha=0.4,lw=1,c=c)
-                axs[0].plot(sk.times,1./0.001*project(sk.voft,[1,0,0]),alpha=1,lw=2,c=c,dashes=d)
-                axs[1].plot(sk.times,1./0.001*project(sk.voft,[0,1,0]),alpha=0.4,lw=1,c=c)
-                axs[1].plot(sk.times,1./0.001*project(sk.voft,[0,1,0]),alpha=1,lw=2,c=c,dashes=d)
-                axs[2].plot(sk.times,1./0.001*project(sk.voft,[0,0,1]),alpha=0.4,lw=1,c=c)
-                axs[2].plot(sk.times,1./0.001*project(sk.voft,[0,0,1]),alpha=1,lw=2,c=c,dashes=d,label=l)
-                axs[3].plot(sk.times,1./0.001*project(sk.voft,sk.kickdir),alpha=0.4,lw=1,c=c)
-                axs[3].plot(sk.times,1./0.001*project(sk.voft,sk.kickdir),alpha=1,lw=2,c=c,dashes=d)
+                # Projections on the coordinate axes are just the columns of voft
+                vx,vy,vz=sk.voft.T
+                vk=project(sk.voft,sk.kickdir)
+                pe=[withStroke(linewidth=3,foreground=c,alpha=0.4)]
+                axs[0].plot(sk.times,1./0.001*vx,lw=2,c=c,dashes=d,path_effects=pe)
+                axs[1].plot(sk.times,1./0.001*vy,lw=2,c=c,dashes=d,path_effects=pe)
+                axs[2].plot(sk.times,1./0.001*vz,lw=2,c=c,dashes=d,label=l,path_effects=pe)
+                axs[3].plot(sk.times,1./0.001*vk,lw=2,c=c,dashes=d,path_effects=pe)
 
             axs[2].legend(loc="lower left",fontsize=14,ncol=2,handlelength=3.86)
             axs[0].text(0.05,0.7,'$q='+str(q)+'$\n$\chi_1=\chi_2=0.8$',transform=axs[    0].transAxes,linespacing=1.4)
@@ -1264,16 +1605,15 @@ class plots(object):
             dashes=['',[15,5],[8,5],[2,2]]
             cols=['C0','C1','C2','C3']
             for sk,l,d,c in tqdm(zip(sks,labels,dashes,cols)):
-                axs[0].plot(sk.times,1./0.001*project(sk.voft,[1,0,0]),alpha=0.4,lw=1,c=c)
-                axs[0].plot(sk.times,1./0.001*project(sk.voft,[1,0,0]),alpha=1,lw=2,c=c,dashes=d)
-                axs[1].plot(sk.times,1./0.001*project(sk.voft,[0,1,0]),alpha=0.4,lw=1,c=c)
-                axs[1].plot(sk.times,1./0.001*project(sk.voft,[0,1,0]),alpha=1,lw=2,c=c,dashes=d,label=l)
-                axs[2].plot(sk.times,1./0.001*project(sk.voft,[0,0,1]),alpha=0.4,lw=1,c=c)
-                axs[2].plot(sk.times,1./0.001*project(sk.voft,[0,0,1]),alpha=1,lw=2,c=c,dashes=d)
-                axi.plot(sk.times,convert.kms(project(sk.voft,[0,0,1])),alpha=0.4,lw=1,c=c)
-                axi.plot(sk.times,convert.kms(project(sk.voft,[0,0,1])),alpha=1,lw=2,c=c,dashes=d)
-                axs[3].plot(sk.times,1./0.001*project(sk.voft,sk.kickdir),alpha=0.4,lw=1,c=c)
-                axs[3].plot(sk.times,1./0.001*project(sk.voft,sk.kickdir),alpha=1,lw=2,c=c,dashes=d)
+                # Projections on the coordinate axes are just the columns of voft
+                vx,vy,vz=sk.voft.T
+                vk=project(sk.voft,sk.kickdir)
+                pe=[withStroke(linewidth=3,foreground=c,alpha=0.4)]
+                axs[0].plot(sk.times,1./0.001*vx,lw=2,c=c,dashes=d,path_effects=pe)
+                axs[1].plot(sk.times,1./0.001*vy,lw=2,c=c,dashes=d,label=l,path_effects=pe)
+                axs[2].plot(sk.times,1./0.001*vz,lw=2,c=c,dashes=d,path_effects=pe)
+                axi.plot(sk.times,convert.kms(vz),lw=2,c=c,dashes=d,path_effects=pe)
+                axs[3].plot(sk.times,1./0.001*vk,lw=2,c=c,dashes=d,path_effects=pe)
 
             axs[1].legend(loc="lower left",fontsize=14,ncol=2,handlelength=3.86)
             axs[0].text(0.05,0.7,'$q='+str(q)+'$\n$\chi_1=\chi_2=0.8$',transform=axs[    0].transAxes,linespacing=1.4)
@@ -1329,22 +1669,22 @@ class plots(object):
 
         dim=200
         chimag=0.8
+        pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
         tref_vals=np.linspace(-250,-100,dim)
-        kick_vals=[]
-        for t_ref in tqdm(tref_vals):
-            sk = surrkick(q=1 , chi1=[chimag,0,0],chi2=[-chimag,0,0],t_ref=t_ref)
-            kick_vals.append(sk.kick)
+        def _trefkick(t_ref):
+            return surrkick(q=1 , chi1=[chimag,0,0],chi2=[-chimag,0,0],t_ref=t_ref).kick
+        kick_vals=list(tqdm(pool.imap(_trefkick,tref_vals),total=dim))
 
         axs[0].plot(tref_vals,1/0.001*np.array(kick_vals))
-        axs[0].scatter(-125,1/0.001*surrkick(q=1 , chi1=[chimag,0,0],chi2=[-chimag,0,0],t_ref=-125).kick,marker='o',edgecolor='C1',facecolor='none',s=100,linewidth='2')
-        axs[0].scatter(-100,1/0.001*surrkick(q=1 , chi1=[chimag,0,0],chi2=[-chimag,0,0],t_ref=-100).kick,marker='x',edgecolor='gray',facecolor='gray',s=100,linewidth='2')
+        kick100=kick_vals[-1] # tref_vals ends exactly at -100: reuse the sweep value instead of re-evaluating
+        axs[0].scatter(-125,1/0.001*_trefkick(-125),marker='o',edgecolor='C1',facecolor='none',s=100,linewidth='2')
+        axs[0].scatter(-100,1/0.001*kick100,marker='x',edgecolor='gray',facecolor='gray',s=100,linewidth='2')
         alpha_vals=np.linspace(-np.pi,np.pi,dim)
-        kick_vals=[]
-        for alpha in tqdm(alpha_vals):
-            sk = surrkick(q=1 , chi1=[chimag*np.cos(alpha),chimag*np.sin(alpha),0],chi2=[-chimag*np.cos(alpha),-chimag*np.sin(alpha),0])
-            kick_vals.append(sk.kick)
+        def _alphakick(alpha):
+            return surrkick(q=1 , chi1=[chimag*np.cos(alpha),chimag*np.sin(alpha),0],chi2=[-chimag*np.cos(alpha),-chimag*np.sin(alpha),0]).kick
+        kick_vals=list(tqdm(pool.imap(_alphakick,alpha_vals),total=dim))
         axs[1].plot(alpha_vals,1/0.001*np.array(kick_vals),c='C3')
-        axs[1].scatter(0,1/0.001*surrkick(q=1 , chi1=[chimag,0,0],chi2=[-chimag,0,0],t_ref=-100).kick,marker='x',edgecolor='gray',facecolor='gray',s=100,linewidth='2')
+        axs[1].scatter(0,1/0.001*kick100,marker='x',edgecolor='gray',facecolor='gray',s=100,linewidth='2')
 
         axs[0].text(0.05,0.5,'$q=1$\n$\chi_1=\chi_2=0.8$\n$\\alpha=0$',transform=axs[0].transAxes,linespacing=1.4)
         axs[1].text(0.05,0.5,'$q=1$\n$\chi_1=\chi_2=0.8$\n$t_{\\rm ref}=-100M$',transform=axs[1].transAxes,linespacing=1.4)
@@ -1381,11 +1721,16 @@ class plots(object):
         ax.axvline(0,c='black',alpha=0.3,ls='dotted')
         ax.axhline(0,c='black',alpha=0.3,ls='dotted')
         alpha_vals=np.linspace(-np.pi,np.pi,30)
-        kick_vals=[]
-        for i, alpha in enumerate(tqdm(alpha_vals)):
+        def _alphaprof(alpha):
+            # Return only what is plotted to keep the interprocess payload small
             sk = surrkick(q=1, chi1=[chimag*np.cos(alpha),chimag*np.sin(alpha),0],chi2=[-chimag*np.cos(alpha),-chimag*np.sin(alpha),0])
-            color=plt.cm.copper(i/len(alpha_vals))
-            ax.plot(sk.times,1/0.001*project(sk.voft,sk.kickdir),color=color,alpha=0.8)
+            return sk.times,project(sk.voft,sk.kickdir)
+        pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+        profiles=list(tqdm(pool.imap(_alphaprof,alpha_vals),total=len(alpha_vals)))
+        # One LineCollection renders all the curves in a single artist
+        segs=[np.column_stack([times,1/0.001*prof]) for times,prof in profiles]
+        colors=[plt.cm.copper(i/len(alpha_vals)) for i in range(len(alpha_vals))]
+        ax.add_collection(LineCollection(segs,colors=colors,alpha=0.8))
         ax.set_xlim(-100,50)
         ax.set_ylim(-1.2,6.7)
 
@@ -1408,7 +1753,7 @@ class plots(object):
         Usage: surrkick.plots.findlarge()'''
 
         dim=int(1e5)
-        filename='findlarge.pkl'
+        filename='findlarge.npy'
 
         q=1
         chi1=0.8
@@ -1416,27 +1761,36 @@ class plots(object):
 
         if not os.path.isfile(filename):
 
+            # Draw all spin orientations in one batch; workers only index into them
+            rng=np.random.default_rng()
+            phi1=rng.uniform(0,2*np.pi,dim)
+            theta1=np.arccos(rng.uniform(-1,1,dim))
+            phi2=rng.uniform(0,2*np.pi,dim)
+            theta2=np.arccos(rng.uniform(-1,1,dim))
+            chi1v=np.stack([chi1*np.sin(theta1)*np.cos(phi1), chi1*np.sin(theta1)*np.sin(phi1), chi1*np.cos(theta1)],axis=1)
+            chi2v=np.stack([chi2*np.sin(theta2)*np.cos(phi2), chi2*np.sin(theta2)*np.sin(phi2), chi2*np.cos(theta2)],axis=1)
+
+            modesl3=[(l,m) for l in (2,3) for m in range(0,l+1)] # l<=3 is plenty for kicks
+
             def _kickdistr(i):
-                np.random.seed()
-                phi1 = np.random.uniform(0,2*np.pi)
-                theta1 = np.arccos(np.random.uniform(-1,1))
-                chi1v= [ chi1*np.sin(theta1)*np.cos(phi1), chi1*np.sin(theta1)*np.sin(phi1), chi1*np.cos(theta1) ]
-                phi2 = np.random.uniform(0,2*np.pi)
-                theta2 = np.arccos(np.random.uniform(-1,1))
-                chi2v= [ chi2*np.sin(theta2)*np.cos(phi2), chi2*np.sin(theta2)*np.sin(phi2), chi2*np.cos(theta2) ]
-                sk= surrkick(q=q,chi1=chi1v,chi2=chi2v)
+                sk= surrkick(q=q,chi1=chi1v[i],chi2=chi2v[i],modes=modesl3)
 
                 dummy,dummy,dummy,S1,S2=precession.get_fixed(q,chi1,chi2)
-                fk=precession.finalkick(theta1,theta2,phi2-phi1,1,S1,S2,maxkick=False,kms=False,more=False)
+                fk=precession.finalkick(theta1[i],theta2[i],phi2[i]-phi1[i],1,S1,S2,maxkick=False,kms=False,more=False)
 
-                return [sk.kick,fk,theta1,theta2]
+                return [sk.kick,fk,theta1[i],theta2[i]]
 
-            print("Running in parallel on", multiprocessing.cpu_count(),"cores. Storing data:", filename)
-            parmap = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count()).imap
-            data= list(tqdm(parmap(_kickdistr, range(dim)),total=dim))
+            ncpu=multiprocessing.cpu_count()
+            print("Running in parallel on", ncpu,"cores. Storing data:", filename)
+            # Batch tasks per IPC round trip; results are self-contained, so order is irrelevant
+            parmap = pathos.multiprocessing.ProcessingPool(ncpu).uimap
+            results=np.empty((dim,4))
+            for n,row in enumerate(tqdm(parmap(_kickdistr, range(dim), chunksize=max(1,dim//(4*ncpu))),total=dim,miniters=max(1,dim//100),mininterval=0.5,smoothing=0)):
+                results[n]=row
 
-            with open(filename, 'wb') as f: pickle.dump(zip(*data), f)
-        with open(filename, 'rb') as f: skicks,fkicks,theta1,theta2 = pickle.load(f)
+            np.save(filename,results)
+        # mmap: histogramming and maxima page in columns without parsing a pickle
+        skicks,fkicks,theta1,theta2 = np.load(filename,mmap_mode='r').T
 
 
         print("Largest kick (surrogate):", convert.kms(max(skicks)))
@@ -1478,12 +1832,14 @@ class plots(object):
                 store.append([randomvec,project(sk.voft,randomvec)[-1]])
 
             store=sorted(store, key=lambda x:x[1])
-            with open(filename, 'wb') as f: pickle.dump(store, f)
+            with open(filename, 'wb') as f: pickle.dump(store, f, protocol=PICKLE_PROTOCOL)
         with open(filename, 'rb') as f: store = pickle.load(f)
 
-        for i,rv in tqdm(zip(np.linspace(0,1,dim),[x[0] for x in store])):
-            color=plt.cm.copper(i)
-            ax.plot(sk.times,1./0.001*project(sk.voft,rv),c=color,alpha=0.8)
+        # One LineCollection renders all the lines of sight in a single artist
+        segs=[np.column_stack([sk.times,1./0.001*project(sk.voft,rv)]) for rv in [x[0] for x in store]]
+        colors=[plt.cm.copper(i) for i in np.linspace(0,1,dim)]
+        ax.add_collection(LineCollection(segs,colors=colors,alpha=0.8))
+        ax.autoscale()
 
         ax.text(0.05,0.75,'$q='+str(q)+'$\n$\chi_1=\chi_2=0.8$\n right-left',transform=ax.transAxes,linespacing=1.4)
         ax.set_xlim(-50,50)
@@ -1521,59 +1877,52 @@ class plots(object):
 
         dim=int(1e6)
 
-        filename='explore.pkl'
+        filename='explore.npy'
         if not os.path.isfile(filename):
 
+            # Draw the whole sample in one batch; workers only index into it
+            rng=np.random.default_rng()
+            qsur=rng.uniform(0.5,1,dim)
+            chi1=randomspins(dim,rng=rng)
+            chi2=randomspins(dim,rng=rng)
+            qfit=rng.uniform(0.5,1,dim)
+            chi1m=0.8*np.cbrt(rng.uniform(0,1,dim))
+            chi2m=0.8*np.cbrt(rng.uniform(0,1,dim))
+            theta1=np.arccos(rng.uniform(-1,1,dim))
+            theta2=np.arccos(rng.uniform(-1,1,dim))
+            deltaphi=rng.uniform(0,2*np.pi,dim)
+
+            modesl3=[(l,m) for l in (2,3) for m in range(0,l+1)] # l<=3 is plenty for kicks
+
             def _explore(i):
                 #print(' ',i)
-                np.random.seed()
-                q=np.random.uniform(0.5,1)
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi1= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi2= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                sk= surrkick(q=q,chi1=chi1,chi2=chi2)
-                q=np.random.uniform(0.5,1)
-                chi1m = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi2m = 0.8*(np.random.uniform(0,1))**(1./3.)
-                theta1=np.arccos(np.random.uniform(-1,1))
-                theta2=np.arccos(np.random.uniform(-1,1))
-                deltaphi = np.random.uniform(0,2*np.pi)
-                dummy,dummy,dummy,S1,S2=precession.get_fixed(q,chi1m,chi2m)
-                fk=precession.finalkick(theta1,theta2,deltaphi,q,S1,S2,maxkick=False,kms=False,more=False)
-                fe=(1-precession.finalmass(theta1,theta2,deltaphi,q,S1,S2))*(1+sk.Eoft[0])
+                sk= surrkick(q=qsur[i],chi1=chi1[i],chi2=chi2[i],modes=modesl3)
+                dummy,dummy,dummy,S1,S2=precession.get_fixed(qfit[i],chi1m[i],chi2m[i])
+                fk=precession.finalkick(theta1[i],theta2[i],deltaphi[i],qfit[i],S1,S2,maxkick=False,kms=False,more=False)
+                fe=(1-precession.finalmass(theta1[i],theta2[i],deltaphi[i],qfit[i],S1,S2))*(1+sk.Eoft[0])
                 return [sk.Erad,sk.kick,sk.Jrad,fk,fe]
 
-            print("Running in parallel on", multiprocessing.cpu_count(),"cores. Storing data:", filename)
-            parmap = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count()).imap
-            data= list(tqdm(parmap(_explore, range(dim)),total=dim))
-            #data= map(_explore, range(dim))
+            ncpu=multiprocessing.cpu_count()
+            print("Running in parallel on", ncpu,"cores. Storing data:", filename)
+            # Batch tasks per IPC round trip; results are self-contained, so order is irrelevant
+            parmap = pathos.multiprocessing.ProcessingPool(ncpu).uimap
+            results=np.empty((dim,5))
+            for n,row in enumerate(tqdm(parmap(_explore, range(dim), chunksize=max(1,dim//(4*ncpu))),total=dim,miniters=max(1,dim//100),mininterval=0.5,smoothing=0)):
+                results[n]=row
 
-            with open(filename, 'wb') as f: pickle.dump(zip(*data), f)
-        with open(filename, 'rb') as f: Erad,kicks,Jrad,fk,fe = pickle.load(f)
-        kicks=np.array(kicks)
-        fk=np.array(fk)
-        fe=np.array(fe)
+            np.save(filename,results)
+        # mmap: histogramming pages in columns without parsing a pickle
+        Erad,kicks,Jrad,fk,fe = np.load(filename,mmap_mode='r').T
 
         nbins=100
-        axE.hist(fe,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='step',lw=2,alpha=0.8,color='C3',normed=True)
-        axE.hist(fe,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='stepfilled',alpha=0.2,color='C3',normed=True)
-        axE.hist(Erad,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='step',lw=2,alpha=0.8,color='C0',normed=True)
-        axE.hist(Erad,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='stepfilled',alpha=0.2,color='C0',normed=True)
+        plothist(axE,fe,'C3',nbins=nbins)
+        plothist(axE,Erad,'C0',nbins=nbins)
         #print("surr", np.median(Erad), np.std(Erad))
         #print("fit", np.median(fe), np.std(fe))
 
-        for ax in [axv,axi]:
-            ax.hist(1/0.001*fk,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='step',lw=2,alpha=0.8,color='C3',label='Fitting formula',normed=True)
-            ax.hist(1/0.001*fk,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='stepfilled',alpha=0.2,color='C3',normed=True)
-            ax.hist(1/0.001*kicks,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='step',lw=2,alpha=0.8,color='C0',label='Surrogate',normed=True)
-            ax.hist(1/0.001*kicks,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='stepfilled',alpha=0.2,color='C0',normed=True)
-        axJ.hist(Jrad,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='step',lw=2,alpha=0.8,color='C0',normed=True)
-        axJ.hist(Jrad,bins=nbins,weights=np.ones_like(Erad)/dim,histtype='stepfilled',alpha=0.2,color='C0',normed=True)
+        plothist([axv,axi],1/0.001*fk,'C3',nbins=nbins,label='Fitting formula')
+        plothist([axv,axi],1/0.001*kicks,'C0',nbins=nbins,label='Surrogate')
+        plothist(axJ,Jrad,'C0',nbins=nbins)
 
         axE.set_xlabel("$E \;\;[M]$")
         axv.set_xlabel("$v_k\;\;[0.001c]$")
@@ -1624,34 +1973,31 @@ class plots(object):
         ax.axhline(0,c='black',alpha=0.3,ls='dotted')
         ax.axhline(1,c='black',alpha=0.3,ls='dotted')
 
-        filename='normprofiles.pkl'
+        filename='normprofiles.npz'
         if not os.path.isfile(filename):
             print("Storing data:", filename)
 
-            data=[]
-            for i in tqdm(range(200)):
-                q=np.random.uniform(0.5,1)
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi1= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi2= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                sk= surrkick(q=q,chi1=chi1,chi2=chi2)
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                randomdir= [np.sin(theta)*np.cos(phi), np.sin(theta)*np.sin(phi), np.cos(theta) ]
-                data.append([sk.kick, project(sk.voft/sk.kick,sk.kickdir)])
+            dim=200
+            rng=np.random.default_rng()
+            qs=rng.uniform(0.5,1,dim)
+            chi1s=randomspins(dim,rng=rng)
+            chi2s=randomspins(dim,rng=rng)
+
+            def _normprofiles(i):
+                sk= surrkick(q=qs[i],chi1=chi1s[i],chi2=chi2s[i])
+                return [sk.kick, project(sk.voft/sk.kick,sk.kickdir)]
 
-            with open(filename, 'wb') as f: pickle.dump(data, f)
-        with open(filename, 'rb') as f: data = pickle.load(f)
+            pool = pathos.multiprocessing.ProcessingPool(multiprocessing.cpu_count())
+            data= list(tqdm(pool.imap(_normprofiles,range(dim)),total=dim))
+
+            np.savez(filename,kicks=np.array([d[0] for d in data]),profiles=np.array([d[1] for d in data]))
+        data=np.load(filename)
+        kicks,profiles=data['kicks'],data['profiles']
 
         times=surrkick().times
-        #data.sort(key=lambda x: x[0])
-        for d in tqdm(data):
-            ax.plot(times,d[1],alpha=0.7, c= plt.cm.copper(d[0]/0.0016),lw=1)
+        # One LineCollection renders all the profiles in a single artist
+        segs=[np.column_stack([times,prof]) for prof in profiles]
+        ax.add_collection(LineCollection(segs,colors=plt.cm.copper(kicks/0.0016),alpha=0.7,lw=1))
 
         axcb = fig.add_axes([0.72,0,0.05,0.7])
         cb = fig.colorbar(CS3,cax=axcb,boundaries=np.linspace(0,1.6,100),ticks=np.linspace(0,1.6,9))
@@ -1682,46 +2028,58 @@ class plots(object):
         axt = [axx.twiny() for axx in ax]
 
         dim=int(1e4)
-        filename='symmetry.pkl'
-        if not os.path.isfile(filename):
+        filename='symmetry.npz'
+        if not os.path.isfile(filename) and not os.path.isfile('symmetry.pkl'):
             print("Storing data:", filename)
 
-            kicks=[[],[],[]]
-
-            for i in tqdm(range(dim)):
-                q=1
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi1 = [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                chi2 = chi1
-                kicks[0].append(surrkick(q=q,chi1=chi1,chi2=chi2).kick)
-
-            for i in tqdm(range(dim)):
-                q=np.random.uniform(0.5,1)
-                chi1 = [ 0, 0, np.random.uniform(-0.8,0.8) ]
-                chi2 = [ 0, 0, np.random.uniform(-0.8,0.8) ]
-                kicks[1].append(surrkick(q=q,chi1=chi1,chi2=chi2).kickcomp[2])
-
-            for i in tqdm(range(dim)):
-                q=1
-                phi = np.random.uniform(0,2*np.pi)
-                theta = np.arccos(np.random.uniform(-1,1))
-                r = 0.8*(np.random.uniform(0,1))**(1./3.)
-                chi1 = [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-                chi2 = [-chi1[0],-chi1[1],chi1[2]]
-                kicks[2].append(np.linalg.norm(np.cross(surrkick(q=q,chi1=chi1,chi2=chi2).kickcomp,[0,0,1])))
-
-            with open(filename, 'wb') as f: pickle.dump(kicks, f)
-        with open(filename, 'rb') as f: kicks = pickle.load(f)
+            kicks=[None,None,None]
+
+            rng=np.random.default_rng()
+            # Cases 0 and 2 sample the same isotropic distribution: draw once
+            chi1 = randomspins(dim,rng=rng)
+            ones = np.ones(dim)
+
+            # q=1, equal spins: the kick should vanish. Keep the full (dim,3)
+            # vectors in the cache; the magnitude is cheap to take at plot time
+            kicks[0]=surrkick.batch(ones,chi1,chi1)
+
+            # q=1, in-plane spin components mirrored: the kick should be aligned with z
+            chi2 = chi1*np.array([-1,-1,1])
+            # |v x z| is just the in-plane magnitude; skip the cross product
+            kc = surrkick.batch(ones,chi1,chi2)
+            kicks[2]=np.hypot(kc[:,0],kc[:,1])
+
+            # Generic q, spins along z: the kick should stay in the orbital plane.
+            # One uniform buffer covers all three draws
+            u=rng.random((dim,3))
+            q=0.5+0.5*u[:,0]
+            chi1 = np.zeros((dim,3))
+            chi1[:,2]=1.6*u[:,1]-0.8
+            chi2 = np.zeros((dim,3))
+            chi2[:,2]=1.6*u[:,2]-0.8
+            kicks[1]=surrkick.batch(q,chi1,chi2)[:,2]
+
+            np.savez(filename,k0=kicks[0],k1=kicks[1],k2=kicks[2])
+        if os.path.isfile(filename):
+            data=np.load(filename)
+            k0=data['k0']
+            # Older caches stored the case-0 magnitudes directly
+            if k0.ndim==2: k0=np.linalg.norm(k0,axis=1)
+            kicks=[k0,data['k1'],data['k2']]
+        else: # Legacy pickle cache from older runs
+            with open('symmetry.pkl', 'rb') as f: kicks = pickle.load(f)
 
         nbins=100
         for axx,kick in zip(ax,kicks):
-            axx.hist(1/0.001*np.abs(kick),bins=nbins,histtype='step',lw=2,alpha=1,color='C4',normed=True)
-            axx.hist(1/0.001*np.abs(kick),bins=nbins,histtype='stepfilled',alpha=0.3,color='C4',normed=True)
-            #print(np.percentile(1/0.001*np.abs(kick), 50),np.percentile(1/0.001*np.abs(kick), 90))
-            axx.axvline(np.percentile(1/0.001*np.abs(kick), 50),c='gray',ls='dashed')
-            axx.axvline(np.percentile(1/0.001*np.abs(kick), 90),c='gray',ls='dotted')
+            scaled=np.abs(kick)*1000.
+            # One quantile call sorts the sample once for both percentiles
+            p50,p90=np.quantile(scaled,[0.5,0.9])
+            counts,edges=np.histogram(scaled,bins=nbins,density=True)
+            axx.stairs(counts,edges,color='C4',lw=2,alpha=1)
+            axx.stairs(counts,edges,color='C4',alpha=0.3,fill=True)
+            #print(p50,p90)
+            axx.axvline(p50,c='gray',ls='dashed')
+            axx.axvline(p90,c='gray',ls='dotted')
 
         ax[0].set_xlabel("$v_k \;\;[0.001c]$")
         ax[1].set_xlabel("$|\mathbf{v_k}\cdot \mathbf{\hat z}| \;\;[0.001c]$")
@@ -1730,11 +2088,8 @@ class plots(object):
         ax[1].text(0.5,0.9,'${\\rm Generic}\; q$\n$\\boldsymbol{\\chi_1}\\times \mathbf{\hat z} = \\boldsymbol{\\chi_2}\\times \mathbf{\hat z}=0$\n$\longrightarrow \mathbf{v_k}\cdot\mathbf{\hat z}=0$',verticalalignment='top',transform=ax[1].transAxes,linespacing=1.6)
         ax[2].text(0.5,0.9,'$q=1$\n$\\boldsymbol{\\chi_1}\\cdot \mathbf{\hat z}=\\boldsymbol{\\chi_2}\\cdot \mathbf{\hat z}$\n$\\boldsymbol{\\chi_1}\\times \mathbf{\hat z} = -\\boldsymbol{\\chi_2}\\times \mathbf{\hat z}$\n$\longrightarrow \mathbf{v_k}\\times\mathbf{\hat z}=0$',verticalalignment='top',transform=ax[2].transAxes,linespacing=1.6)
         for axx,axxt in zip(ax,axt):
-            axx.xaxis.set_minor_locator(AutoMinorLocator())
-            axx.yaxis.set_minor_locator(AutoMinorLocator())
             axxt.set_xlim(convert.kms(1e-3*np.array(axx.get_xlim())))
-            axxt.xaxis.set_minor_locator(AutoMinorLocator())
-            axxt.yaxis.set_minor_locator(AutoMinorLocator())
+            minorticks(axx,axxt)
             axxt.set_xlabel("$[{\\rm km/s}]$",labelpad=8)
         axt[0].xaxis.set_major_locator(MultipleLocator(50))
         axt[1].xaxis.set_major_locator(MultipleLocator(5))
@@ -1752,52 +2107,34 @@ class plots(object):
         ax = fig.add_axes([0,0,1.25,0.6])
         axt = ax.twiny()
 
-        nr100 = np.loadtxt(os.path.dirname(os.path.abspath(__file__))+"/"+"nr_comparison_data/nr_kicks_t100.dat")
-        nr4500 = np.loadtxt(os.path.dirname(os.path.abspath(__file__))+"/"+"nr_comparison_data/nr_kicks_t4500.dat")
+        nr4500 = _load_nr(os.path.dirname(os.path.abspath(__file__))+"/"+"nr_comparison_data/nr_kicks_t4500.dat")
 
-        def _nr_surr_comparison_data_helper(nr_data, t):
-            kicks = []
-            for d in nr_data:
-                q = d[2]
-                chi1 = [d[3], d[4], d[5]]
-                chi2 = [d[6], d[7], d[8]]
-                kicks.append(surrkick(q=q, chi1=chi1, chi2=chi2, t_ref=t).kick)
-            return np.array(kicks)
+        surr100 = _nr_surr_cached(-100)
+        surr4500 = _nr_surr_cached(-4500)
 
-        filename='nr_comparison_kicks_t100.pkl'
-        if not os.path.isfile(filename):
-            print("Storing data:", filename)
-            surr_kicks = _nr_surr_comparison_data_helper(nr100, -100)
-            with open(filename, 'wb') as f: pickle.dump(surr_kicks, f)
-        with open(filename, 'rb') as f: surr100 = pickle.load(f)
-
-        filename='nr_comparison_kicks_t4500.pkl'
-        if not os.path.isfile(filename):
-            print("Storing data:", filename)
-            surr_kicks = _nr_surr_comparison_data_helper(nr4500, -4500)
-            with open(filename, 'wb') as f: pickle.dump(surr_kicks, f)
-        with open(filename, 'rb') as f: surr4500 = pickle.load(f)
-
-        mag_nr = nr4500[:,12] / 0.001
-        mag_nr_lev2 = nr4500[:,16] / 0.001
-        mag_nr_lmax4 = nr4500[:,20] / 0.001
-        mag_surr = surr4500[:] / 0.001
-        mag_surr_t100 = surr100[:] / 0.001
+        mag_nr = nr4500[:,12] * 1000.
+        mag_nr_lev2 = nr4500[:,16] * 1000.
+        mag_nr_lmax4 = nr4500[:,20] * 1000.
+        mag_surr = surr4500[:] * 1000.
+        mag_surr_t100 = surr100[:] * 1000.
         delta_nr_surr = np.fabs(mag_nr - mag_surr)
         delta_nr_levs = np.fabs(mag_nr - mag_nr_lev2)
         delta_nr_lmax = np.fabs(mag_nr - mag_nr_lmax4)
         delta_surr_times = np.fabs(mag_surr - mag_surr_t100)
 
         logbins = np.logspace(-6, 1.3, 50)
-        ax.hist(mag_nr, bins=logbins, histtype='stepfilled', alpha=0.6, label="$v_k$ NR", color='C3')
-        ax.hist(mag_surr, bins=logbins, histtype='stepfilled', alpha=0.6, label="$v_k$ Surrogate", color='C0')
-        ax.hist(mag_nr, bins=logbins, histtype='step', alpha=0.8,color='C3',lw=1.8)
-        ax.hist(mag_surr, bins=logbins, histtype='step',alpha=0.8, color='C0',lw=1.8)
-        ax.hist(delta_nr_surr, bins=logbins, histtype='step', label="$\Delta v_k$ NR vs. Surrogate",color='black',ls='dashed',lw=2,zorder=20)
+        # Bin each sample once in numpy; the outline/filled pairs reuse the same counts
+        counts_nr = np.histogram(mag_nr, bins=logbins)[0]
+        counts_surr = np.histogram(mag_surr, bins=logbins)[0]
+        ax.stairs(counts_nr, logbins, fill=True, alpha=0.6, label="$v_k$ NR", color='C3')
+        ax.stairs(counts_surr, logbins, fill=True, alpha=0.6, label="$v_k$ Surrogate", color='C0')
+        ax.stairs(counts_nr, logbins, alpha=0.8,color='C3',lw=1.8)
+        ax.stairs(counts_surr, logbins, alpha=0.8, color='C0',lw=1.8)
+        ax.stairs(np.histogram(delta_nr_surr, bins=logbins)[0], logbins, label="$\Delta v_k$ NR vs. Surrogate",color='black',ls='dashed',lw=2,zorder=20)
         #print(np.percentile(delta_nr_surr, 90))
-        ax.hist(delta_nr_levs, bins=logbins, histtype='step', label="$\Delta v_k$ NR resolution", color='C1',lw=1.8)
-        ax.hist(delta_surr_times, bins=logbins, histtype='step', label="$\Delta v_k$ Surr $t_{\\rm ref}/M\!=\!-100$ vs.  $\!-4500$",color='C2',lw=1.8)
-        ax.hist(delta_nr_lmax, bins=logbins, histtype='step', label="$\Delta v_k$ NR $l_{\\rm max}\!=\!8$ vs. $4$",color='C4',lw=1.8)
+        ax.stairs(np.histogram(delta_nr_levs, bins=logbins)[0], logbins, label="$\Delta v_k$ NR resolution", color='C1',lw=1.8)
+        ax.stairs(np.histogram(delta_surr_times, bins=logbins)[0], logbins, label="$\Delta v_k$ Surr $t_{\\rm ref}/M\!=\!-100$ vs.  $\!-4500$",color='C2',lw=1.8)
+        ax.stairs(np.histogram(delta_nr_lmax, bins=logbins)[0], logbins, label="$\Delta v_k$ NR $l_{\\rm max}\!=\!8$ vs. $4$",color='C4',lw=1.8)
 
         ax.legend(loc=2, ncol=1, fontsize=14).set_zorder(100)
         ax.set_xscale("log")
@@ -1831,31 +2168,14 @@ class plots(object):
         axt = fig.add_axes([0, main_h + gap, main_w, hist_h])
         axr = fig.add_axes([main_w + gap, 0, hist_h, main_h])
 
-        nr4500 = np.loadtxt(os.path.dirname(os.path.abspath(__file__))+"/"+"nr_comparison_data/nr_kicks_t4500.dat")
+        nr4500 = _load_nr(os.path.dirname(os.path.abspath(__file__))+"/"+"nr_comparison_data/nr_kicks_t4500.dat")
 
-        # duplicated from histogram plot
-        def _nr_surr_comparison_data_helper(nr_data, t):
-            kicks = []
-            for d in nr_data:
-                q = d[2]
-                chi1 = [d[3], d[4], d[5]]
-                chi2 = [d[6], d[7], d[8]]
-                kicks.append(surrkick(q=q, chi1=chi1, chi2=chi2, t_ref=t).kick)
-            return np.array(kicks)
+        surr4500 = _nr_surr_cached(-4500)
 
-        # duplicated from histogram plot
-        filename='nr_comparison_kicks_t4500.pkl'
-        if not os.path.isfile(filename):
-            surr_kicks = _nr_surr_comparison_data_helper(nr4500, -4500)
-            print("Storing data:", filename)
-            with open(filename, 'wb') as f: pickle.dump(surr_kicks, f)
-        with open(filename, 'rb') as f: surr4500 = pickle.load(f)
-
-        mag_nr = nr4500[:,12] / 0.001
-        mag_surr = surr4500[:] / 0.001
+        mag_nr = nr4500[:,12] * 1000.
+        mag_surr = surr4500[:] * 1000.
         diff = np.fabs(mag_nr - mag_surr)
-        perc50 = np.percentile(diff, 50)
-        perc90 = np.percentile(diff, 90)
+        perc50, perc90 = np.percentile(diff, [50, 90])
         print("  50th percentile of kick magnitude diffs [0.001c]:", perc50)
         print("  90th percentile of kick magnitude diffs [0.001c]:", perc90)
         x = np.array([0,1e4])
@@ -1882,10 +2202,13 @@ class plots(object):
         ax.set_ylim(0,10.5)
         ax.set_xlabel("NR $v_k\;[0.001c]$")
         ax.set_ylabel("Surrogate $v_k\;[0.001c]$")
-        ax.xaxis.set_major_locator(MultipleLocator(2))
-        ax.xaxis.set_minor_locator(MultipleLocator(0.5))
-        ax.yaxis.set_major_locator(MultipleLocator(2))
-        ax.yaxis.set_minor_locator(MultipleLocator(0.5))
+        # One place sets every locator of the three panels; fresh instances per
+        # axis since a locator cannot be shared
+        def _locators(axis,major,minor):
+            axis.set_major_locator(MultipleLocator(major))
+            axis.set_minor_locator(MultipleLocator(minor))
+        for axis in (ax.xaxis,ax.yaxis,axt.xaxis,axr.yaxis): _locators(axis,2,0.5)
+        for axis in (axt.yaxis,axr.xaxis): _locators(axis,40,10)
 
         bins = np.linspace(0, 10.5, 36)
         axt.hist(mag_nr, bins=bins, histtype='stepfilled',alpha=0.4,color='C0')
@@ -1893,20 +2216,12 @@ class plots(object):
         axt.set_xlim(0,10.5)
         axt.set_ylim(0,90)
         axt.axes.xaxis.set_ticklabels([])
-        axt.xaxis.set_major_locator(MultipleLocator(2))
-        axt.xaxis.set_minor_locator(MultipleLocator(0.5))
-        axt.yaxis.set_major_locator(MultipleLocator(40))
-        axt.yaxis.set_minor_locator(MultipleLocator(10))
 
         axr.hist(mag_surr, bins=bins, histtype='stepfilled', orientation='horizontal',alpha=0.4,color='C0')
         axr.hist(mag_surr, bins=bins, histtype='step', orientation='horizontal',color='C0')
         axr.set_xlim(0,90)
         axr.set_ylim(0,10.5)
         axr.axes.yaxis.set_ticklabels([])
-        axr.xaxis.set_major_locator(MultipleLocator(40))
-        axr.xaxis.set_minor_locator(MultipleLocator(10))
-        axr.yaxis.set_major_locator(MultipleLocator(2))
-        axr.yaxis.set_minor_locator(MultipleLocator(0.5))
 
         return fig
 
@@ -1942,7 +2257,7 @@ class plots(object):
                     ps = - project(sk.Poft, sk.kickdir)
                     surr_profiles[case] = [ts, ps]
             print("Storing data:", filename)
-            with open(filename, 'wb') as f: pickle.dump(surr_profiles, f)
+            with open(filename, 'wb') as f: pickle.dump(surr_profiles, f, protocol=PICKLE_PROTOCOL)
         with open(filename, 'rb') as f: surr_data = pickle.load(f)
 
         axes = [ax_ll, ax_lr, ax_ur, ax_ul]
@@ -1984,44 +2299,34 @@ class plots(object):
         '''Surrkick code performance (no plot)
         Usage: surrkick.plots.timing()'''
 
-        dim=1000
+        # timeit repeats each expression until the total is long enough to beat the
+        # clock resolution, so far fewer random draws are needed than with time.time()
+        dim=100
         surrogate().sur() # Load the surrogate once for all
+        assert surrogate() is surrogate() # Singleton: later surrkick calls reuse this instance
+
+        rng=np.random.default_rng()
+        qs=rng.uniform(0.5,1,dim)
+        chi1s=randomspins(dim,rng=rng)
+        chi2s=randomspins(dim,rng=rng)
 
         timessur=[]
-        timeskick=[]
         timesall=[]
-        for i in tqdm(range(dim)):
-
-            q=np.random.uniform(0.5,1)
-            phi = np.random.uniform(0,2*np.pi)
-            theta = np.arccos(np.random.uniform(-1,1))
-            r = 0.8*(np.random.uniform(0,1))**(1./3.)
-            chi1= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-            phi = np.random.uniform(0,2*np.pi)
-            theta = np.arccos(np.random.uniform(-1,1))
-            r = 0.8*(np.random.uniform(0,1))**(1./3.)
-            chi2= [ r*np.sin(theta)*np.cos(phi), r*np.sin(theta)*np.sin(phi), r*np.cos(theta) ]
-            sk= surrkick(q=q,chi1=chi1,chi2=chi2)
-
-            t0=time.time()
-            sk.hsample
-            tsur=time.time()-t0
-
-            t0=time.time()
-            sk.kick
-            tkick=time.time()-t0
-
-            t0=time.time()
-            sk=surrkick(q=q,chi1=chi1,chi2=chi2).kick
-            tall=time.time()-t0
-
-            timessur.append(tsur)
-            timeskick.append(tkick)
-            timesall.append(tall)
-
-        print("Time, surrogate waveform:", np.mean(timessur),'s')
-        print("Time, kick:", np.mean(timeskick),'s')
-        print("Time, both:", np.mean(timesall),'s')
+        for i in tqdm(range(dim),miniters=max(1,dim//100),mininterval=0.5,smoothing=0):
+
+            q,chi1,chi2=qs[i],chi1s[i],chi2s[i]
+
+            # Properties are cached, so each timed call builds a fresh instance
+            n,t=timeit.Timer(lambda: surrkick(q=q,chi1=chi1,chi2=chi2).hsample).autorange()
+            timessur.append(t/n)
+            n,t=timeit.Timer(lambda: surrkick(q=q,chi1=chi1,chi2=chi2).kick).autorange()
+            timesall.append(t/n)
+
+        tsur=np.median(timessur)
+        tall=np.median(timesall)
+        print("Time, surrogate waveform:", tsur,'s')
+        print("Time, kick:", tall-tsur,'s')
+        print("Time, both:", tall,'s')
 
     @classmethod
     @plottingstuff
@@ -2201,7 +2506,7 @@ class plots(object):
                 kicksmin.append(kickmin)
                 kicksmax.append(kickmax)
 
-            with open(filename, 'wb') as f: pickle.dump([normRIT,kicksRIT,kicksmin,kicksmax], f)
+            with open(filename, 'wb') as f: pickle.dump([normRIT,kicksRIT,kicksmin,kicksmax], f, protocol=PICKLE_PROTOCOL)
 
         with open(filename, 'rb') as f: normRIT,kicksRIT,kicksmin,kicksmax = np.array(pickle.load(f))
 